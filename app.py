@@ -1,6 +1,23 @@
 import streamlit as st
 import pandas as pd
-import numpy_financial as npf
+import numpy as np
+
+from finance import pmt, irr
+
+# --- FIXED ASSUMPTIONS (Simplified for demo) ---
+STAMP_DUTY_RATE = 0.04 # Est 4%
+CLOSING_COSTS = 2000
+SELLING_COST_RATE = 0.025
+MAX_HOLDING_PERIOD = 30
+# Simplified Depreciation: $6,000 a year for the first 10 years
+ANNUAL_DEPRECIATION = 6000.0
+DEPRECIATION_YEARS = 10
+
+# Sensitivity Matrix grid: interest rates down the rows, capital growth across the columns
+INTEREST_RANGES = np.array([0.04, 0.05, 0.06, 0.07, 0.08])
+GROWTH_RANGES = np.array([0.03, 0.04, 0.05, 0.06, 0.07])
+INTEREST_INDEX = pd.Index([f"Int: {i:.0%}" for i in INTEREST_RANGES])
+GROWTH_COLUMNS = pd.Index([f"Growth: {g:.0%}" for g in GROWTH_RANGES])
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Property Investment Calculator", layout="wide")
@@ -27,125 +44,194 @@ st.sidebar.header("3. Tax & Growth Assumptions")
 marginal_tax_rate = st.sidebar.selectbox("Marginal Tax Rate", [0.0, 0.19, 0.325, 0.37, 0.45, 0.47], index=3)
 capital_growth = st.sidebar.slider("Capital Growth Rate (%)", 0.0, 10.0, 5.0, 0.1) / 100
 cpi_rate = st.sidebar.slider("CPI / Expense Growth (%)", 0.0, 10.0, 2.5, 0.1) / 100
-holding_period = st.sidebar.slider("Planned Holding Period (Years)", 1, 30, 10)
+holding_period = st.sidebar.slider("Planned Holding Period (Years)", 1, MAX_HOLDING_PERIOD, 10)
 
 # --- CALCULATION ENGINE ---
 
-def calculate_scenario(p_price, l_amount, i_rate, cap_growth):
+def _cash_flow_stream(initial_equity, annual_cf, net_proceeds):
     """
-    Calculates the full 30-year projection based on inputs.
-    Returns a dictionary of key metrics and the dataframe.
+    Year 0 equity outlay followed by the annual cash flows, with the sale proceeds
+    added to the final year. Broadcasts over any leading axes.
     """
+    shape = np.broadcast_shapes(annual_cf.shape[:-1], np.shape(net_proceeds))
+    stream = np.empty(shape + (annual_cf.shape[-1] + 1,))
+    stream[..., 0] = -initial_equity
+    stream[..., 1:] = annual_cf
+    stream[..., -1] += net_proceeds
+    return stream
+
+def _project(p_price, l_amount, i_rate, cap_growth, *,
+             weekly_rent, vacancy_rate, annual_opex, land_tax,
+             marginal_tax_rate, cpi_rate, loan_term,
+             interest_only_period, holding_period):
+    """
+    Numeric core of a scenario: pure NumPy, no DataFrame.
+    Returns per-year arrays for years 1..holding_period plus the IRR cash flow streams.
+    i_rate and cap_growth may be broadcastable arrays; years run along the last axis.
+    """
+    i_rate = np.asarray(i_rate)[..., None]
+    cap_growth = np.asarray(cap_growth)[..., None]
     
-    # Initial Costs (Simplified for demo)
-    stamp_duty = p_price * 0.04 # Est 4%
-    closing_costs = 2000
-    total_upfront_cost = p_price + stamp_duty + closing_costs
+    # Initial Costs (also the CGT cost base)
+    total_upfront_cost = p_price * (1 + STAMP_DUTY_RATE) + CLOSING_COSTS
     initial_equity = total_upfront_cost - l_amount
     
-    years = range(holding_period + 1)
-    data = []
-
-    # Running balances
-    current_loan = l_amount
-    current_value = p_price
-    current_rent = weekly_rent * 52 * (1 - vacancy_rate)
-    current_opex = annual_opex + land_tax
-
-    cash_flows_pre_tax = [-initial_equity]
-    cash_flows_post_tax = [-initial_equity]
-    total_principal_paid = 0
-
-    for year in years:
-        if year == 0:
-            data.append([year, p_price, l_amount, 0, 0, 0, 0, 0, 0, 0, -initial_equity])
-            continue
-
-        # 1. Inflate Income/Expenses
-        current_rent *= (1 + cpi_rate) if year > 1 else 1
-        current_opex *= (1 + cpi_rate) if year > 1 else 1
-        
-        # 2. Calculate NOI
-        noi = current_rent - current_opex
-        
-        # 3. Loan Calcs
-        if year <= interest_only_period:
-            interest_payment = current_loan * i_rate
-            principal_payment = 0
-        else:
-            # Simple PMT simulation for remaining term
-            remaining_term = loan_term - (year - 1)
-            if remaining_term > 0:
-                payment = -npf.pmt(i_rate, remaining_term, current_loan)
-                interest_payment = current_loan * i_rate
-                principal_payment = payment - interest_payment
-            else:
-                interest_payment = 0
-                principal_payment = 0 # Loan paid off
-        
-        # Update Loan Balance
-        current_loan -= principal_payment
-        if current_loan < 0: current_loan = 0
-        total_principal_paid += principal_payment
-
-        # 4. Tax Calcs (Simplified Depreciation)
-        depreciation = 6000 if year <= 10 else 0 
-        taxable_income = noi - interest_payment - depreciation
-        tax_payable = taxable_income * marginal_tax_rate
-        
-        # 5. Cash Flows
-        pre_tax_cf = noi - interest_payment - principal_payment
-        post_tax_cf = pre_tax_cf - tax_payable
-        
-        # 6. Appreciation
-        current_value *= (1 + cap_growth)
-        
-        # Store Year Data
-        data.append([year, current_value, current_loan, current_rent, current_opex, noi, interest_payment, principal_payment, tax_payable, pre_tax_cf, post_tax_cf])
-        
-        # Add to Cash Flow Stream for IRR (excluding terminal value for now)
-        if year < holding_period:
-            cash_flows_pre_tax.append(pre_tax_cf)
-            cash_flows_post_tax.append(post_tax_cf)
+    years = np.arange(1, holding_period + 1)
+
+    # 1. Inflate Income/Expenses (from Year 2 onwards)
+    cpi_growth = (1 + cpi_rate) ** (years - 1)
+    rent = weekly_rent * 52 * (1 - vacancy_rate) * cpi_growth
+    opex = (annual_opex + land_tax) * cpi_growth
+
+    # 2. Calculate NOI, and the part of taxable income that doesn't depend on the loan
+    noi = rent - opex
+    noi_less_depreciation = noi - np.where(years <= DEPRECIATION_YEARS, ANNUAL_DEPRECIATION, 0.0)
+
+    # 3. Loan Calcs: interest only, then P&I over the remaining term, then paid off
+    amortizing_term = max(loan_term - interest_only_period, 0)
+    payment = -pmt(i_rate, amortizing_term, l_amount) if amortizing_term > 0 else 0
+
+    # Closed-form balance after k P&I payments: L*(1+r)^k - PMT*((1+r)^k - 1)/r,
+    # evaluated once for the end of Years 0..H and shared by opening and closing balances.
+    # ((1+r)^k - 1)/r tends to k as r -> 0, so a zero rate pays the loan down linearly.
+    k = np.clip(np.arange(holding_period + 1) - interest_only_period, 0, amortizing_term)
+    compound = (1 + i_rate) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payments_accumulated = np.where(i_rate == 0, k, (compound - 1) / i_rate)
+    balance = np.maximum(l_amount * compound - payment * payments_accumulated, 0)
+    opening_loan = balance[..., :-1]
+    loan = balance[..., 1:]
+
+    interest_payment = np.where(years <= max(loan_term, interest_only_period), opening_loan * i_rate, 0)
+    principal_payment = opening_loan - loan
+
+    # 4. Tax Calcs
+    taxable_income = noi_less_depreciation - interest_payment
+    tax_payable = taxable_income * marginal_tax_rate
+
+    # 5. Cash Flows
+    pre_tax_cf = noi - interest_payment - principal_payment
+    post_tax_cf = pre_tax_cf - tax_payable
+
+    # 6. Appreciation
+    value = p_price * (1 + cap_growth) ** years
 
     # --- TERMINAL VALUE (SALE) ---
-    sale_price = data[-1][1]
-    selling_costs = sale_price * 0.025
-    loan_balance = data[-1][2]
+    sale_price = value[..., -1]
+    selling_costs = sale_price * SELLING_COST_RATE
+    loan_balance = loan[..., -1]
     
     # CGT Calc
-    cost_base = p_price + stamp_duty + closing_costs
-    gross_gain = sale_price - selling_costs - cost_base
+    gross_gain = sale_price - selling_costs - total_upfront_cost
     taxable_gain = gross_gain * 0.5 if holding_period > 1 else gross_gain # 50% Discount
     cgt_payable = taxable_gain * marginal_tax_rate
     
     net_proceeds_post_tax = sale_price - selling_costs - loan_balance - cgt_payable
     net_proceeds_pre_tax = sale_price - selling_costs - loan_balance
 
-    # Final Year Cash Flow Adjustment for IRR
-    cash_flows_post_tax.append(data[-1][10] + net_proceeds_post_tax)
-    cash_flows_pre_tax.append(data[-1][9] + net_proceeds_pre_tax)
+    # Cash Flow Streams for IRR
+    cash_flows_pre_tax = _cash_flow_stream(initial_equity, pre_tax_cf, net_proceeds_pre_tax)
+    cash_flows_post_tax = _cash_flow_stream(initial_equity, post_tax_cf, net_proceeds_post_tax)
+
+    return {
+        "Initial Equity": initial_equity,
+        "Value": value,
+        "Loan": loan,
+        "Rent": rent,
+        "Opex": opex,
+        "NOI": noi,
+        "Interest": interest_payment,
+        "Principal": principal_payment,
+        "Tax": tax_payable,
+        "Pre-Tax CF": pre_tax_cf,
+        "Post-Tax CF": post_tax_cf,
+        "Net Proceeds Post-Tax": net_proceeds_post_tax,
+        "Cash Flows Pre-Tax": cash_flows_pre_tax,
+        "Cash Flows Post-Tax": cash_flows_post_tax,
+    }
+
+@st.cache_data(max_entries=512)
+def calculate_scenario(p_price, l_amount, i_rate, cap_growth, *,
+                       weekly_rent, vacancy_rate, annual_opex, land_tax,
+                       marginal_tax_rate, cpi_rate, loan_term,
+                       interest_only_period, holding_period):
+    """
+    Calculates the full 30-year projection based on inputs.
+    Returns a dictionary of key metrics and the dataframe.
+    A pure function of its arguments (no module globals), so results can be cached per input set.
+    """
+    projection = _project(p_price, l_amount, i_rate, cap_growth,
+                          weekly_rent=weekly_rent, vacancy_rate=vacancy_rate,
+                          annual_opex=annual_opex, land_tax=land_tax,
+                          marginal_tax_rate=marginal_tax_rate, cpi_rate=cpi_rate,
+                          loan_term=loan_term, interest_only_period=interest_only_period,
+                          holding_period=holding_period)
+    initial_equity = projection["Initial Equity"]
 
     # Metrics
-    irr_post_tax = npf.irr(cash_flows_post_tax)
-    irr_pre_tax = npf.irr(cash_flows_pre_tax)
+    irr_post_tax = irr(projection["Cash Flows Post-Tax"])
+    irr_pre_tax = irr(projection["Cash Flows Pre-Tax"])
     
-    total_cash_in = sum(df_row[10] for df_row in data[1:]) + net_proceeds_post_tax
-    total_cash_out = initial_equity + total_principal_paid
+    total_cash_in = projection["Post-Tax CF"].sum() + projection["Net Proceeds Post-Tax"]
+    total_cash_out = initial_equity + projection["Principal"].sum()
     coc_total_outlay = total_cash_in / total_cash_out if total_cash_out > 0 else 0
 
-    df = pd.DataFrame(data, columns=["Year", "Value", "Loan", "Rent", "Opex", "NOI", "Interest", "Principal", "Tax", "Pre-Tax CF", "Post-Tax CF"])
+    # Year 0 is the purchase; Years 1+ are written straight from the projection arrays
+    n_rows = holding_period + 1
+    table = {"Year": np.arange(n_rows)}
+    for column in ["Value", "Loan", "Rent", "Opex", "NOI", "Interest", "Principal", "Tax", "Pre-Tax CF", "Post-Tax CF"]:
+        table[column] = np.zeros(n_rows)
+        table[column][1:] = projection[column]
+    table["Value"][0] = p_price
+    table["Loan"][0] = l_amount
+    table["Post-Tax CF"][0] = -initial_equity
+
+    df = pd.DataFrame(table)
     
     return {
         "IRR Post-Tax": irr_post_tax,
         "IRR Pre-Tax": irr_pre_tax,
         "Cash on Cash (Total)": coc_total_outlay,
-        "Net Profit": sum(cash_flows_post_tax),
+        "Net Profit": projection["Cash Flows Post-Tax"].sum(),
         "Data": df
     }
 
+@st.cache_data(max_entries=512)
+def build_sensitivity_matrix(p_price, l_amount, *,
+                             weekly_rent, vacancy_rate, annual_opex, land_tax,
+                             marginal_tax_rate, cpi_rate, loan_term,
+                             interest_only_period, holding_period):
+    """
+    Post-Tax IRR for every Interest Rate x Capital Growth combination.
+    Cached as a whole, so reruns with unchanged inputs skip all 25 scenarios.
+    The scenarios are projected together by broadcasting rates down the rows and growth across the columns.
+    """
+    projection = _project(p_price, l_amount, INTEREST_RANGES[:, None], GROWTH_RANGES[None, :],
+                          weekly_rent=weekly_rent, vacancy_rate=vacancy_rate,
+                          annual_opex=annual_opex, land_tax=land_tax,
+                          marginal_tax_rate=marginal_tax_rate, cpi_rate=cpi_rate,
+                          loan_term=loan_term, interest_only_period=interest_only_period,
+                          holding_period=holding_period)
+    matrix_data = irr(projection["Cash Flows Post-Tax"])
+    
+    # Create DataFrame for Heatmap
+    return pd.DataFrame(matrix_data, index=INTEREST_INDEX, columns=GROWTH_COLUMNS)
+
+# Inputs shared by the main scenario and every sensitivity scenario
+scenario_inputs = dict(
+    weekly_rent=weekly_rent,
+    vacancy_rate=vacancy_rate,
+    annual_opex=annual_opex,
+    land_tax=land_tax,
+    marginal_tax_rate=marginal_tax_rate,
+    cpi_rate=cpi_rate,
+    loan_term=loan_term,
+    interest_only_period=interest_only_period,
+    holding_period=holding_period,
+)
+
 # Run Calculation for Current Inputs
-results = calculate_scenario(purchase_price, loan_amount, interest_rate, capital_growth)
+results = calculate_scenario(purchase_price, loan_amount, interest_rate, capital_growth, **scenario_inputs)
 
 # --- DISPLAY OUTPUTS ---
 
@@ -161,7 +247,12 @@ tab1, tab2 = st.tabs(["📈 Projections & Charts", "🎲 Sensitivity Matrix"])
 
 with tab1:
     st.subheader(f"Year-by-Year Projections ({holding_period} Years)")
-    st.dataframe(results['Data'].style.format("${:,.0f}"))
+    # Dollar format for every column except Year, applied by the grid itself (no Styler pass)
+    dollar_columns = {
+        column: st.column_config.NumberColumn(format="$%,.0f")
+        for column in results['Data'].columns if column != "Year"
+    }
+    st.dataframe(results['Data'], column_config=dollar_columns)
     
     st.subheader("Cash Flow vs. Equity Buildup")
     chart_data = results['Data'][['Year', 'Post-Tax CF', 'Value', 'Loan']].set_index('Year')
@@ -172,24 +263,7 @@ with tab2:
     st.subheader("Sensitivity Analysis: Interest Rate vs. Capital Growth")
     st.write("See how your **Post-Tax IRR** changes under different market conditions.")
     
-    # Define ranges
-    growth_ranges = [0.03, 0.04, 0.05, 0.06, 0.07]
-    interest_ranges = [0.04, 0.05, 0.06, 0.07, 0.08]
-    
-    matrix_data = []
-    
-    for ir in interest_ranges:
-        row = []
-        for cg in growth_ranges:
-            # Run a mini-scenario for every combination
-            res = calculate_scenario(purchase_price, loan_amount, ir, cg)
-            row.append(res['IRR Post-Tax'])
-        matrix_data.append(row)
-        
-    # Create DataFrame for Heatmap
-    matrix_df = pd.DataFrame(matrix_data, 
-                             index=[f"Int: {i:.0%}" for i in interest_ranges], 
-                             columns=[f"Growth: {g:.0%}" for g in growth_ranges])
+    matrix_df = build_sensitivity_matrix(purchase_price, loan_amount, **scenario_inputs)
     
     # Display as a colored table
-    st.dataframe(matrix_df.style.format("{:.2%}_{}").background_gradient(cmap="RdYlGn", axis=None))
+    st.dataframe(matrix_df.style.format("{:.2%}").background_gradient(cmap="RdYlGn", axis=None))
@@ -0,0 +1,71 @@
+"""
+Small replacements for the numpy_financial functions used by the calculator.
+"""
+import numpy as np
+
+# Growth factors (1 + rate) scanned for NPV sign changes: -99.99% up to +99,999,900%,
+# about 1.2% apart in (1 + rate)
+_GROWTH_GRID = np.geomspace(1e-4, 1e6, 2001)
+_RATE_GRID = _GROWTH_GRID - 1
+
+def pmt(r, n, pv):
+    """
+    Periodic payment for a fully amortizing loan (negative for a positive loan amount).
+    Closed form; r may be an array. At r == 0 the payment is -pv / n, as in npf.pmt.
+    """
+    r = np.asarray(r, dtype=float)
+    c = (1 + r) ** n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(r == 0, -pv / n, (-pv * c) * r / (c - 1))
+    return payment[()]
+
+def irr(cash_flows, tol=1e-10, maxiter=100):
+    """
+    Internal rate of return: of the roots of NPV(rate) = 0 above -100%, the one closest
+    to zero (the same rule as npf.irr). Solves every stream along the last axis at once.
+
+    NPV's sign is scanned over a grid of rates from -99.99% to +99,999,900%, every sign
+    change is refined with Newton steps (bisecting whenever a step would leave its bracket)
+    and the refined root with the smallest magnitude is returned. NaN where the scan finds
+    no sign change: no IRR exists, every root lies outside the grid, or an even number of
+    roots fall within a single grid cell.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    n = cash_flows.shape[-1]
+    t = np.arange(n)
+
+    # Scaling NPV by a positive power of (1 + rate) keeps its sign; pick the power so no
+    # term overflows: NPV itself above 0%, NPV * (1 + rate)^(N-1) below
+    exponents = np.where(_GROWTH_GRID[:, None] >= 1, -t, n - 1 - t)
+    signs = np.sign(cash_flows @ np.power(_GROWTH_GRID[:, None], exponents).T)
+    sign_change = (signs[..., :-1] * signs[..., 1:] < 0) | ((signs[..., :-1] == 0) & (signs[..., 1:] != 0))
+
+    # NPV has at most N - 1 roots above -100% (Descartes' rule of signs),
+    # so gather at most that many bracketing cells per stream
+    cells = np.argsort(~sign_change, axis=-1, kind="stable")[..., :max(n - 1, 1)]
+    has_root = np.take_along_axis(sign_change, cells, axis=-1)
+    lo = _RATE_GRID[cells]
+    hi = _RATE_GRID[cells + 1]
+    sign_lo = np.take_along_axis(signs, cells, axis=-1)
+    rate = np.where(sign_lo == 0, lo, (lo + hi) / 2)
+    flows = cash_flows[..., None, :]
+    with np.errstate(all="ignore"):
+        for _ in range(maxiter):
+            discount = np.power(1 + rate[..., None], -t)
+            npv = np.sum(flows * discount, axis=-1)
+            d_npv = np.sum(-t * flows * discount, axis=-1) / (1 + rate)
+            # Keep the half of the bracket that still contains the sign change
+            same_as_lo = np.sign(npv) == sign_lo
+            lo = np.where(same_as_lo, rate, lo)
+            hi = np.where(same_as_lo, hi, rate)
+            newton = rate - npv / d_npv
+            next_rate = np.where((newton > lo) & (newton < hi), newton, (lo + hi) / 2)
+            next_rate = np.where(npv == 0, rate, next_rate)
+            converged = np.abs(next_rate - rate) < tol
+            rate = next_rate
+            if np.all(converged | ~has_root):
+                break
+
+    roots = np.where(has_root, rate, np.inf)
+    closest = np.take_along_axis(roots, np.argmin(np.abs(roots), axis=-1)[..., None], axis=-1)[..., 0]
+    return np.where(np.isfinite(closest), closest, np.nan)[()]
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# app.py and finance.py live at the repository root, not in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
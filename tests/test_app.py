@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+# Importing the Streamlit script runs it once in bare mode with the default sidebar inputs
+import app
+
+
+DEFAULT_INPUTS = dict(
+    weekly_rent=600,
+    vacancy_rate=0.03,
+    annual_opex=6000,
+    land_tax=0,
+    marginal_tax_rate=0.37,
+    cpi_rate=0.025,
+    loan_term=30,
+    interest_only_period=0,
+    holding_period=10,
+)
+
+
+@pytest.mark.parametrize("p_price, l_amount, overrides", [
+    (750000, 600000, {}),
+    (750000, 700000, dict(weekly_rent=300, holding_period=1)),
+    (750000, 600000, dict(weekly_rent=400, interest_only_period=5, holding_period=30)),
+    (750000, 600000, dict(loan_term=10, interest_only_period=10, holding_period=25, land_tax=1500)),
+])
+def test_sensitivity_matrix_matches_individual_scenarios(p_price, l_amount, overrides):
+    inputs = {**DEFAULT_INPUTS, **overrides}
+    matrix = app.build_sensitivity_matrix(p_price, l_amount, **inputs)
+
+    assert matrix.shape == (len(app.INTEREST_RANGES), len(app.GROWTH_RANGES))
+    for i, i_rate in enumerate(app.INTEREST_RANGES):
+        for j, cap_growth in enumerate(app.GROWTH_RANGES):
+            expected = app.calculate_scenario(p_price, l_amount, i_rate, cap_growth, **inputs)["IRR Post-Tax"]
+            assert not np.isnan(expected)
+            assert matrix.iloc[i, j] == pytest.approx(expected, abs=1e-9)
+
+
+def test_irr_matches_numpy_financial_over_sidebar_ranges():
+    npf = pytest.importorskip("numpy_financial")
+    from finance import irr
+
+    for weekly_rent in (300, 400, 600, 900):
+        for interest_only_period in (0, 5, 10):
+            for holding_period in (1, 2, 5, 10, 30):
+                inputs = {**DEFAULT_INPUTS, "weekly_rent": weekly_rent,
+                          "interest_only_period": interest_only_period,
+                          "holding_period": holding_period}
+                # Interest rates down the rows, capital growth across the columns
+                projection = app._project(750000, 600000,
+                                          np.array([0.02, 0.03, 0.06, 0.1])[:, None],
+                                          np.array([0.0, 0.02, 0.05, 0.1])[None, :], **inputs)
+                for key in ("Cash Flows Pre-Tax", "Cash Flows Post-Tax"):
+                    streams = projection[key].reshape(-1, holding_period + 1)
+                    expected = [npf.irr(stream) for stream in streams]
+                    np.testing.assert_allclose(irr(streams), expected, atol=1e-8)
+
+
+def test_zero_interest_rate_pays_loan_down_linearly():
+    inputs = {**DEFAULT_INPUTS, "loan_term": 20, "interest_only_period": 5, "holding_period": 30}
+    data = app.calculate_scenario(750000, 600000, 0.0, 0.05, **inputs)["Data"]
+
+    assert not data.isna().any().any()
+    assert (data["Interest"] == 0).all()
+    # Interest only for 5 years, then $40,000 a year over the remaining 15
+    np.testing.assert_allclose(data["Loan"].iloc[:6], 600000)
+    np.testing.assert_allclose(data["Principal"].iloc[6:21], 40000)
+    assert data["Loan"].iloc[20:].max() == pytest.approx(0, abs=1e-6)
+
+
+def test_holding_period_beyond_the_sidebar_range():
+    inputs = {**DEFAULT_INPUTS, "holding_period": 35}
+    results = app.calculate_scenario(750000, 600000, 0.06, 0.05, **inputs)
+
+    assert len(results["Data"]) == 36
+    assert not np.isnan(results["IRR Post-Tax"])
+    matrix = app.build_sensitivity_matrix(750000, 600000, **inputs)
+    assert not matrix.isna().any().any()
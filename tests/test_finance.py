@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from finance import irr, pmt
+
+
+# Reference values from the numpy_financial.irr documentation
+@pytest.mark.parametrize("cash_flows, expected", [
+    ([-100, 39, 59, 55, 20], 0.28095),
+    ([-100, 0, 0, 74], -0.0955),
+    ([-100, 100, 0, -7], -0.0833),
+    ([-100, 100, 0, 7], 0.06206),
+    ([-5, 10.5, 1, -8, 1], 0.0886),
+])
+def test_irr_known_values(cash_flows, expected):
+    assert irr(cash_flows) == pytest.approx(expected, abs=5e-5)
+
+
+@pytest.mark.parametrize("cash_flows, expected", [
+    ([-100, 50], -0.5),
+    ([-100, 110], 0.1),
+    ([-100, 1], -0.99),
+    ([-182000, 91000], -0.5),
+])
+def test_irr_two_cash_flows(cash_flows, expected):
+    assert irr(cash_flows) == pytest.approx(expected)
+
+
+def test_irr_far_from_ten_percent():
+    # A 30-year stream with a small positive return, and one that loses most of the outlay
+    assert irr([-100] + [0] * 29 + [148]) == pytest.approx(1.48 ** (1 / 30) - 1)
+    assert irr([-100] + [0] * 29 + [5]) == pytest.approx(0.05 ** (1 / 30) - 1)
+
+
+def test_irr_stays_above_minus_one():
+    cash_flows = [-182000] + [-4000] * 29 + [20000]
+    rate = irr(cash_flows)
+    assert rate > -1
+    t = np.arange(len(cash_flows))
+    assert np.sum(cash_flows / (1 + rate) ** t) == pytest.approx(0, abs=1e-6)
+
+
+def test_irr_picks_the_root_closest_to_zero():
+    # NPV = 0 at both -61.86% and +63.45%; npf.irr returns the one nearer zero
+    cash_flows = [-132022.27, 123030.86, 137698.88, 48897.81, -42714.06]
+    assert irr(cash_flows) == pytest.approx(-0.61859, abs=1e-5)
+
+
+def test_irr_very_large_return():
+    assert irr([-100, 20000]) == pytest.approx(199)
+
+
+@pytest.mark.parametrize("cash_flows", [[-100, -5], [100, 5, 5], [0, 0, 0]])
+def test_irr_without_sign_change_is_nan(cash_flows):
+    assert np.isnan(irr(cash_flows))
+
+
+def test_irr_solves_each_row():
+    cash_flows = np.array([
+        [-100, 39, 59, 55, 20],
+        [-100, 50, 0, 0, 0],
+        [-100, -5, 0, 0, 0],
+    ])
+    rates = irr(cash_flows)
+    assert rates.shape == (3,)
+    for row, rate in zip(cash_flows, rates):
+        np.testing.assert_equal(rate, irr(row))
+
+
+def test_pmt_matches_annuity_formula():
+    # $600k over 30 years at 6%: the standard annuity payment, negative as in npf.pmt
+    assert pmt(0.06, 30, 600000) == pytest.approx(-43589.35, abs=0.01)
+    np.testing.assert_allclose(pmt(np.array([0.04, 0.06]), 30, 600000),
+                               [pmt(0.04, 30, 600000), pmt(0.06, 30, 600000)])
+
+
+def test_pmt_at_zero_rate():
+    # Same as npf.pmt: the loan is repaid in equal instalments
+    assert pmt(0.0, 30, 600000) == pytest.approx(-20000)
+    np.testing.assert_allclose(pmt(np.array([0.0, 0.06]), 30, 600000),
+                               [-20000, pmt(0.06, 30, 600000)])